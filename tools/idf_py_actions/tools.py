@@ -1,17 +1,25 @@
 # SPDX-FileCopyrightText: 2022-2023 Espressif Systems (Shanghai) CO LTD
 # SPDX-License-Identifier: Apache-2.0
 import asyncio
+import atexit
+import codecs
+import contextlib
+import functools
 import importlib
 import json
+import mmap
 import os
 import re
+import shutil
+import signal
 import subprocess
 import sys
+import threading
 from asyncio.subprocess import Process
 from io import open
 from pkgutil import iter_modules
 from types import FunctionType
-from typing import Any, Dict, Generator, List, Match, Optional, TextIO, Tuple, Union
+from typing import IO, Any, Callable, Dict, Generator, List, Match, Optional, TextIO, Tuple, Union
 
 import click
 import yaml
@@ -21,6 +29,12 @@ from idf_py_actions.errors import NoSerialPortFoundError
 from .constants import GENERATORS
 from .errors import FatalError
 
+try:
+    # the LibYAML based loader is much faster, but it is available only if PyYAML was built with it
+    from yaml import CSafeLoader as SafeLoader
+except ImportError:
+    from yaml import SafeLoader  # type: ignore
+
 # Name of the program, normally 'idf.py'.
 # Can be overridden from idf.bat using IDF_PY_PROGRAM_NAME
 PROG = os.getenv('IDF_PY_PROGRAM_NAME', 'idf.py')
@@ -31,6 +45,30 @@ SHELL_COMPLETE_VAR = '_IDF.PY_COMPLETE'
 # was shell completion invoked?
 SHELL_COMPLETE_RUN = SHELL_COMPLETE_VAR in os.environ
 
+# hints yml files loaded by load_hints(), path: (modification time, size, hints)
+_HINTS_CACHE: Dict[str, Tuple[int, int, List]] = {}
+
+# repetition of the previous item in a regular expression, e.g. {2} or {1,3}
+_REPEAT_RE = re.compile(r'\{\d*,?\d*\}')
+
+# CMakeCache files parsed by _parse_cmakecache(), path: (modification time, size, entries)
+_CMAKECACHE_CACHE: Dict[str, Tuple[int, int, Dict]] = {}
+
+# ANSI escape sequences, removed from the output of the tools before writing it into the build log
+_ANSI_ESCAPE_RE = re.compile(r'\x1B(?:[@-Z\\-_]|\[[0-?]*[ -/]*[@-~])')
+
+_ANSI_ESCAPE_BYTES_RE = re.compile(_ANSI_ESCAPE_RE.pattern.encode())
+
+# arguments with whitespace, which are not quoted yet
+_QUOTE_ARG_RE = re.compile(r"^(?![\'\"]).*\s.*")
+
+# progression of the build tool, e.g. "[12/345] Building C object..." or "... (42 %)"
+_PROGRESSION_RE = re.compile(r'^\[\d+/\d+\]|.*\(\d+ \%\)$')
+
+# cmake cache lines look like: CMAKE_CXX_FLAGS_DEBUG:STRING=-g
+# groups are name, type, value
+_CMAKECACHE_LINE_RE = re.compile(rb'^([^#/:=\r\n]+):([^:=\r\n]+)=([^\r\n]*)\r?\n', re.MULTILINE)
+
 
 # The ctx dict "abuses" how python evaluates default parameter values.
 # https://docs.python.org/3/reference/compound_stmts.html#function-definitions
@@ -64,12 +102,13 @@ def _set_build_context(args: 'PropertyDict') -> None:
 
 
 def executable_exists(args: List) -> bool:
-    try:
-        subprocess.check_output(args)
-        return True
+    # only the executable is looked up in PATH, it is much faster than running the command
+    return _which(args[0]) is not None
 
-    except Exception:
-        return False
+
+@functools.lru_cache(maxsize=32)
+def _which(executable: str) -> Optional[str]:
+    return shutil.which(executable)
 
 
 def _idf_version_from_cmake() -> Optional[str]:
@@ -95,14 +134,20 @@ def get_target(path: str, sdkconfig_filename: str='sdkconfig') -> Optional[str]:
     return get_sdkconfig_value(path, 'CONFIG_IDF_TARGET')
 
 
+@functools.lru_cache(maxsize=1)
 def idf_version() -> Optional[str]:
     """Print version of ESP-IDF"""
 
+    git_dir = os.path.join(os.environ['IDF_PATH'], '.git')
+    if not os.path.exists(git_dir):
+        # not a git repository (e.g. ESP-IDF release archive), don't waste time with running git
+        return _idf_version_from_cmake()
+
     #  Try to get version from git:
     try:
         version: Optional[str] = subprocess.check_output([
             'git',
-            '--git-dir=%s' % os.path.join(os.environ['IDF_PATH'], '.git'),
+            '--git-dir=%s' % git_dir,
             '--work-tree=%s' % os.environ['IDF_PATH'],
             'describe', '--tags', '--dirty', '--match', 'v*.*',
         ]).decode('utf-8', 'ignore').strip()
@@ -167,6 +212,104 @@ def debug_print_idf_version() -> None:
     print_warning(f'ESP-IDF {idf_version() or "version unknown"}')
 
 
+def _literal_anchor(regex: re.Pattern, min_length: int=4) -> Optional[str]:
+    """
+    Find the longest literal text which has to be present in a string matched by `regex`. Only the top level
+    of the expression is considered, parts in groups, sets, escapes and repeated characters are skipped.
+    Returns None if no such text of at least `min_length` characters was found.
+    """
+    pattern = regex.pattern
+    if not isinstance(pattern, str) or regex.flags & (re.IGNORECASE | re.VERBOSE):
+        return None
+
+    anchor, run = '', ''
+    depth = 0
+    i = 0
+    while i < len(pattern):
+        char = pattern[i]
+        if depth == 0 and (char.isalnum() or char in '_ '):
+            run += char
+            i += 1
+            continue
+
+        if char in '?*+{':
+            # the last character is repeated, so it is not required
+            run = run[:-1]
+        if len(run) > len(anchor):
+            anchor = run
+        run = ''
+
+        if char == '\\':
+            # skip escape sequence together with its arguments, e.g. \x1b, \d or \N{...}
+            i += 2
+            while i < len(pattern) and pattern[i].isalnum():
+                i += 1
+            if pattern[i - 1:i] == 'N' and pattern[i:i + 1] == '{':
+                i = pattern.find('}', i) + 1 or len(pattern)
+            continue
+        if char == '[':
+            # skip set of characters, `]` can be its first member
+            i += 1
+            if pattern[i:i + 1] == '^':
+                i += 1
+            if pattern[i:i + 1] == ']':
+                i += 1
+            while i < len(pattern) and pattern[i] != ']':
+                i += 2 if pattern[i] == '\\' else 1
+        elif char == '{':
+            repeat = _REPEAT_RE.match(pattern, i)
+            if repeat:
+                i = repeat.end() - 1
+        elif char == '(':
+            depth += 1
+        elif char == ')':
+            depth = max(depth - 1, 0)
+        elif char == '|' and depth == 0:
+            # none of the alternatives is required
+            return None
+        i += 1
+
+    if len(run) > len(anchor):
+        anchor = run
+    return anchor if len(anchor) >= min_length else None
+
+
+def _compile_hint(hint: Dict) -> None:
+    """Precompile regular expressions of the `hint` loaded from hints yml file"""
+    try:
+        variables_list = hint.get('variables')
+        if variables_list:
+            hint['_variables'] = []
+            for variables in variables_list:
+                regex = _compiled(hint['re'].format(*variables['re_variables']))
+                hint['_variables'].append((regex, _literal_anchor(regex), variables['hint_variables']))
+        else:
+            hint['_re'] = _compiled(hint['re'])
+            hint['_anchor'] = _literal_anchor(hint['_re'])
+    except KeyError as e:
+        red_print('Argument {} missing in {}. Check hints.yml file.'.format(e, hint))
+        sys.exit(1)
+    except re.error as e:
+        red_print('{} from hints.yml have {} problem. Check hints.yml file.'.format(hint['re'], e))
+        sys.exit(1)
+
+
+def _load_hints_yml(path: str) -> List:
+    """Load hints yml file with precompiled regular expressions, the result is reused until the file changes"""
+    stat = os.stat(path)
+    cached = _HINTS_CACHE.get(path)
+    if cached and cached[:2] == (stat.st_mtime_ns, stat.st_size):
+        return cached[2]
+
+    with open(path, 'r') as file:
+        hints_yml: List = yaml.load(file, Loader=SafeLoader)
+    for hint in hints_yml:
+        _compile_hint(hint)
+
+    _HINTS_CACHE[path] = (stat.st_mtime_ns, stat.st_size, hints_yml)
+    return hints_yml
+
+
 def load_hints() -> Dict:
     """Helper function to load hints yml file"""
     hints: Dict = {
@@ -175,8 +318,7 @@ def load_hints() -> Dict:
     }
 
     current_module_dir = os.path.dirname(__file__)
-    with open(os.path.join(current_module_dir, 'hints.yml'), 'r') as file:
-        hints['yml'] = yaml.safe_load(file)
+    hints['yml'] = _load_hints_yml(os.path.join(current_module_dir, 'hints.yml'))
 
     hint_modules_dir = os.path.join(current_module_dir, 'hint_modules')
     if not os.path.exists(hint_modules_dir):
@@ -198,6 +340,12 @@ def load_hints() -> Dict:
     return hints
 
 
+@functools.lru_cache(maxsize=None)
+def _compiled(pattern: str) -> re.Pattern:
+    """Compile the regular expression `pattern` only once per process"""
+    return re.compile(pattern)
+
+
 def generate_hints_buffer(output: str, hints: Dict) -> Generator:
     """Helper function to process hints within a string buffer"""
     # Call modules for possible hints with unchanged output. Note that
@@ -209,31 +357,23 @@ def generate_hints_buffer(output: str, hints: Dict) -> Generator:
             yield module_hint
 
     # hints expect new lines trimmed
-    output = ' '.join(line.strip() for line in output.splitlines() if line.strip())
+    output = ' '.join(filter(None, map(str.strip, output.splitlines())))
     for hint in hints['yml']:
-        variables_list = hint.get('variables')
-        hint_list, hint_vars, re_vars = [], [], []
+        hint_list = []
         match: Optional[Match[str]] = None
-        try:
-            if variables_list:
-                for variables in variables_list:
-                    hint_vars = variables['hint_variables']
-                    re_vars = variables['re_variables']
-                    regex = hint['re'].format(*re_vars)
-                    if re.compile(regex).search(output):
-                        try:
-                            hint_list.append(hint['hint'].format(*hint_vars))
-                        except KeyError as e:
-                            red_print('Argument {} missing in {}. Check hints.yml file.'.format(e, hint))
-                            sys.exit(1)
-            else:
-                match = re.compile(hint['re']).search(output)
-        except KeyError as e:
-            red_print('Argument {} missing in {}. Check hints.yml file.'.format(e, hint))
-            sys.exit(1)
-        except re.error as e:
-            red_print('{} from hints.yml have {} problem. Check hints.yml file.'.format(hint['re'], e))
-            sys.exit(1)
+        if '_variables' in hint:
+            for regex, anchor, hint_vars in hint['_variables']:
+                # skip the search if a text required by the regex is not present in the output
+                if anchor and anchor not in output:
+                    continue
+                if regex.search(output):
+                    try:
+                        hint_list.append(hint['hint'].format(*hint_vars))
+                    except KeyError as e:
+                        red_print('Argument {} missing in {}. Check hints.yml file.'.format(e, hint))
+                        sys.exit(1)
+        elif not hint['_anchor'] or hint['_anchor'] in output:
+            match = hint['_re'].search(output)
         if hint_list:
             for message in hint_list:
                 yield ' '.join(['HINT:', message])
@@ -249,14 +389,16 @@ def generate_hints(*filenames: str) -> Generator:
     """Getting output files and printing hints on how to resolve errors based on the output."""
     hints = load_hints()
     for file_name in filenames:
-        with open(file_name, 'r') as file:
+        # the output can be captured without decoding, so it may contain invalid characters
+        with open(file_name, 'r', encoding='utf8', errors='ignore') as file:
             yield from generate_hints_buffer(file.read(), hints)
 
 
-def fit_text_in_terminal(out: str) -> str:
+def fit_text_in_terminal(out: str, terminal_width: Optional[int]=None) -> str:
     """Fit text in terminal, if the string is not fit replace center with `...`"""
     space_for_dots = 3  # Space for "..."
-    terminal_width, _ = os.get_terminal_size()
+    if terminal_width is None:
+        terminal_width, _ = os.get_terminal_size()
     if not terminal_width:
         return out
     if terminal_width <= space_for_dots:
@@ -270,6 +412,9 @@ def fit_text_in_terminal(out: str) -> str:
 
 
 class RunTool:
+    # event loop for running interactive tools, it is created by the first one and reused by the others
+    _event_loop: Optional[asyncio.AbstractEventLoop] = None
+
     def __init__(self, tool_name: str, args: List, cwd: str, env: Dict=None, custom_error_handler: FunctionType=None, build_dir: str=None,
                  hints: bool=True, force_progression: bool=False, interactive: bool=False, convert_output: bool=False) -> None:
         self.tool_name = tool_name
@@ -283,15 +428,17 @@ class RunTool:
         self.force_progression = force_progression
         self.interactive = interactive
         self.convert_output = convert_output
+        # width of the terminal used for printing progression, None if it is not known yet
+        self._terminal_width: Optional[int] = None
 
     def __call__(self) -> None:
         def quote_arg(arg: str) -> str:
             """ Quote the `arg` with whitespace in them because it can cause problems when we call it from a subprocess."""
-            if re.match(r"^(?![\'\"]).*\s.*", arg):
+            if _QUOTE_ARG_RE.match(arg):
                 return ''.join(["'", arg, "'"])
             return arg
 
-        self.args = [str(arg) for arg in self.args]
+        self.args = [arg if isinstance(arg, str) else str(arg) for arg in self.args]
         display_args = ' '.join(quote_arg(arg) for arg in self.args)
         print('Running %s in directory %s' % (self.tool_name, quote_arg(self.cwd)))
         print('Executing "%s"...' % str(display_args))
@@ -299,12 +446,16 @@ class RunTool:
         env_copy = dict(os.environ)
         env_copy.update(self.env or {})
 
-        process: Union[Process, subprocess.CompletedProcess[bytes]]
-        if self.hints:
-            process, stderr_output_file, stdout_output_file = asyncio.run(self.run_command(self.args, env_copy))
-        else:
-            process = subprocess.run(self.args, env=env_copy, cwd=self.cwd)
-            stderr_output_file, stdout_output_file = None, None
+        process: Union[Process, subprocess.Popen[bytes], subprocess.CompletedProcess[bytes]]
+        with self.watch_terminal_width():
+            if self.hints and self.interactive:
+                process, stderr_output_file, stdout_output_file = self.get_event_loop().run_until_complete(
+                    self.run_interactive_command(self.args, env_copy))
+            elif self.hints:
+                process, stderr_output_file, stdout_output_file = self.run_command(self.args, env_copy)
+            else:
+                process = subprocess.run(self.args, env=env_copy, cwd=self.cwd)
+                stderr_output_file, stdout_output_file = None, None
         if process.returncode == 0:
             return
 
@@ -322,14 +473,85 @@ class RunTool:
 
         raise FatalError('{} failed with exit code {}'.format(self.tool_name, process.returncode))
 
-    async def run_command(self, cmd: List, env_copy: Dict) -> Tuple[Process, Optional[str], Optional[str]]:
-        """ Run the `cmd` command with capturing stderr and stdout from that function and return returncode
-        and of the command, the id of the process, paths to captured output """
-        log_dir_name = 'log'
+    def terminal_width(self) -> int:
+        """ Return the width of the terminal, the system is asked only for the first progression line after start or resize """
+        if self._terminal_width is None:
+            self._terminal_width, _ = os.get_terminal_size()
+        return self._terminal_width
+
+    @contextlib.contextmanager
+    def watch_terminal_width(self) -> Generator:
+        """ Forget the known width of the terminal when the terminal is resized while the tool is running """
+        # signal handlers can be set only from the main thread and SIGWINCH is not available on Windows
+        if not self.force_progression or not hasattr(signal, 'SIGWINCH') or threading.current_thread() is not threading.main_thread():
+            yield
+            return
+
+        previous_handler = signal.getsignal(signal.SIGWINCH)
+
+        def handle_resize(signum: int, frame: Any) -> None:
+            self._terminal_width = None
+            if callable(previous_handler):
+                previous_handler(signum, frame)
+
+        signal.signal(signal.SIGWINCH, handle_resize)
         try:
-            os.mkdir(os.path.join(self.build_dir, log_dir_name))
+            yield
+        finally:
+            signal.signal(signal.SIGWINCH, previous_handler if previous_handler is not None else signal.SIG_DFL)
+
+    @classmethod
+    def get_event_loop(cls) -> asyncio.AbstractEventLoop:
+        """ Return the event loop for interactive tools, it is closed when idf.py exits """
+        if cls._event_loop is None:
+            cls._event_loop = asyncio.new_event_loop()
+            atexit.register(cls._event_loop.close)
+        return cls._event_loop
+
+    def make_log_dir(self) -> str:
+        """ Create the directory for captured output of the tool in the build directory and return its path """
+        log_dir = os.path.join(self.build_dir, 'log')
+        try:
+            os.mkdir(log_dir)
         except FileExistsError:
             pass
+        return log_dir
+
+    def run_command(self, cmd: List, env_copy: Dict) -> Tuple['subprocess.Popen[bytes]', str, str]:
+        """ Run the `cmd` command with capturing stderr and stdout from that function and return returncode
+        and of the command, the id of the process, paths to captured output """
+        log_dir = self.make_log_dir()
+        errors: List[BaseException] = []
+
+        def read_pipe(input_pipe: IO[bytes], output_filename: str, output_stream: TextIO) -> None:
+            try:
+                self.read_and_write_pipe(input_pipe, output_filename, output_stream)
+            except BaseException as e:
+                errors.append(e)
+                # the rest of the output is discarded, so the process isn't blocked by the full pipe
+                while input_pipe.read(65536):
+                    pass
+
+        # Note: we explicitly pass in os.environ here, as we may have set IDF_PATH there during startup
+        # leaving the context closes the pipes and waits for the process, so its returncode is set
+        with subprocess.Popen(cmd, env=env_copy, cwd=self.cwd, stdout=subprocess.PIPE, stderr=subprocess.PIPE) as p:
+            stderr_output_file = os.path.join(log_dir, f'idf_py_stderr_output_{p.pid}')
+            stdout_output_file = os.path.join(log_dir, f'idf_py_stdout_output_{p.pid}')
+            # every pipe has its own reader, so the process can't get blocked by a full pipe which is not being read
+            readers = [threading.Thread(target=read_pipe, args=(p.stderr, stderr_output_file, sys.stderr), daemon=True),
+                       threading.Thread(target=read_pipe, args=(p.stdout, stdout_output_file, sys.stdout), daemon=True)]
+            for reader in readers:
+                reader.start()
+            for reader in readers:
+                reader.join()
+        if errors:
+            raise errors[0]
+        return p, stderr_output_file, stdout_output_file
+
+    async def run_interactive_command(self, cmd: List, env_copy: Dict) -> Tuple[Process, str, str]:
+        """ Run the `cmd` command in interactive mode with capturing stderr and stdout from that function and return
+        returncode and of the command, the id of the process, paths to captured output """
+        log_dir = self.make_log_dir()
         # Note: we explicitly pass in os.environ here, as we may have set IDF_PATH there during startup
         # limit was added for avoiding error in idf.py confserver
         try:
@@ -342,8 +564,8 @@ class RunTool:
                     'available from: https://dl.espressif.com/dl/esp-idf/'
             sys.exit(message)
 
-        stderr_output_file = os.path.join(self.build_dir, log_dir_name, f'idf_py_stderr_output_{p.pid}')
-        stdout_output_file = os.path.join(self.build_dir, log_dir_name, f'idf_py_stdout_output_{p.pid}')
+        stderr_output_file = os.path.join(log_dir, f'idf_py_stderr_output_{p.pid}')
+        stdout_output_file = os.path.join(log_dir, f'idf_py_stdout_output_{p.pid}')
         if p.stderr and p.stdout:  # it only to avoid None type in p.std
             await asyncio.gather(
                 self.read_and_write_stream(p.stderr, stderr_output_file, sys.stderr),
@@ -351,97 +573,157 @@ class RunTool:
         await p.wait()  # added for avoiding None returncode
         return p, stderr_output_file, stdout_output_file
 
+    def read_and_write_pipe(self, input_pipe: IO[bytes], output_filename: str, output_stream: TextIO) -> None:
+        """read the output of the `input_pipe` line by line and then write it into `output_filename` and `output_stream`"""
+        if not self.convert_output and not output_stream.isatty():
+            # idf.py output is redirected, so there is no progression to print and the output doesn't need
+            # to be processed line by line
+            try:
+                output_fd = output_stream.fileno()
+            except (AttributeError, OSError, ValueError):
+                pass
+            else:
+                self.copy_pipe(input_pipe, output_filename, output_stream, output_fd)
+                return
+
+        try:
+            with open(output_filename, 'w', encoding='utf8') as output_file:
+                write_output = self.output_writer(output_file, output_stream)
+                for output_b in iter(input_pipe.readline, b''):
+                    write_output(output_b.decode(errors='ignore'))
+        except (RuntimeError, EnvironmentError) as e:
+            self.print_capture_warning(e, output_stream)
+
+    def copy_pipe(self, input_pipe: IO[bytes], output_filename: str, output_stream: TextIO, output_fd: int) -> None:
+        """copy the output of the `input_pipe` into `output_filename` and into the file descriptor `output_fd`
+        of `output_stream` without decoding it"""
+        def write_all(fd: int, data: bytes) -> None:
+            view = memoryview(data)
+            while view:
+                view = view[os.write(fd, view):]
+
+        try:
+            with open(output_filename, 'wb') as output_file:
+                # the output written by idf.py itself must not be mixed into the output of the tool
+                output_stream.flush()
+                pending = b''
+                while True:
+                    output_b = os.read(input_pipe.fileno(), 65536)
+                    if not output_b:
+                        output_b, pending = pending, b''
+                        if not output_b:
+                            break
+                    else:
+                        # Only finished lines are passed on, the same way as the line by line processing does,
+                        # so the output of stdout and stderr isn't mixed in the middle of a line and escape
+                        # sequences split between reads are removed as well.
+                        output_b = pending + output_b
+                        end = output_b.rfind(b'\n') + 1
+                        output_b, pending = output_b[:end], output_b[end:]
+                        if not output_b:
+                            continue
+                    if b'\x1b' in output_b:
+                        output_b = _ANSI_ESCAPE_BYTES_RE.sub(b'', output_b)
+                    output_file.write(output_b)
+                    write_all(output_fd, output_b)
+        except (RuntimeError, EnvironmentError) as e:
+            self.print_capture_warning(e, output_stream)
+
     async def read_and_write_stream(self, input_stream: asyncio.StreamReader, output_filename: str,
                                     output_stream: TextIO) -> None:
-        """read the output of the `input_stream` and then write it into `output_filename` and `output_stream`"""
+        """read the interactive output of the `input_stream` and then write it into `output_filename` and `output_stream`"""
+        # multi-byte characters can be split between reads, the decoder keeps the incomplete ones for the next read
+        decoder = codecs.getincrementaldecoder('utf-8')(errors='ignore')
+
+        async def read_interactive_stream() -> Optional[str]:
+            while True:
+                # read() returns as soon as some data are available, so the output is passed on without delay
+                output_b = await input_stream.read(4096)
+                if not output_b:
+                    return decoder.decode(b'', final=True) or None
+                output = decoder.decode(output_b)
+                if output:
+                    return output
+
+        try:
+            with open(output_filename, 'w', encoding='utf8') as output_file:
+                write_output = self.output_writer(output_file, output_stream)
+                while True:
+                    output = await read_interactive_stream()
+                    if not output:
+                        break
+                    write_output(output)
+        except (RuntimeError, EnvironmentError) as e:
+            self.print_capture_warning(e, output_stream)
+
+    def output_writer(self, output_file: TextIO, output_stream: TextIO) -> Callable[[str], None]:
+        """Return function which writes the output of the tool into `output_file` and `output_stream`"""
         def delete_ansi_escape(text: str) -> str:
-            ansi_escape = re.compile(r'\x1B(?:[@-Z\\-_]|\[[0-?]*[ -/]*[@-~])')
-            return ansi_escape.sub('', text)
+            # most of the lines don't contain any escape sequences, so the regex engine is needed only for the rest
+            if '\x1b' not in text:
+                return text
+            return _ANSI_ESCAPE_RE.sub('', text)
 
         def print_progression(output: str) -> None:
             # Print a new line on top of the previous line
-            print('\r' + fit_text_in_terminal(output.strip('\n\r')) + '\x1b[K', end='', file=output_stream)
+            print('\r' + fit_text_in_terminal(output.strip('\n\r'), self.terminal_width()) + '\x1b[K', end='', file=output_stream)
             output_stream.flush()
 
         def is_progression(output: str) -> bool:
             # try to find possible progression by a pattern match
-            if re.match(r'^\[\d+/\d+\]|.*\(\d+ \%\)$', output):
+            if _PROGRESSION_RE.match(output):
                 return True
             return False
 
-        async def read_stream() -> Optional[str]:
-            try:
-                output_b = await input_stream.readline()
-                return output_b.decode(errors='ignore')
-            except (asyncio.LimitOverrunError, asyncio.IncompleteReadError) as e:
-                print(e, file=sys.stderr)
-                return None
-            except AttributeError:
-                return None
-
-        async def read_interactive_stream() -> Optional[str]:
-            buffer = b''
-            while True:
-                output_b = await input_stream.read(1)
-                if not output_b:
-                    return None
-                try:
-                    return (buffer + output_b).decode()
-                except UnicodeDecodeError:
-                    buffer += output_b
-                    if len(buffer) > 4:
-                        # Multi-byte character contain up to 4 bytes and if buffer have more then 4 bytes
-                        # and still can not decode it we can just ignore some bytes
-                        return buffer.decode(errors='replace')
-
         # use ANSI color converter for Monitor on Windows
         output_converter = get_ansi_converter(output_stream) if self.convert_output else output_stream
 
         # used in interactive mode to print hints after matched line
-        hints = load_hints()
+        hints = load_hints() if self.interactive else {}
         last_line = ''
         is_progression_last_line = False
         is_progression_processing_enabled = self.force_progression and output_stream.isatty() and '-v' not in self.args
 
-        try:
-            with open(output_filename, 'w', encoding='utf8') as output_file:
-                while True:
-                    if self.interactive:
-                        output = await read_interactive_stream()
-                    else:
-                        output = await read_stream()
-                    if not output:
-                        break
-
-                    output_noescape = delete_ansi_escape(output)
-                    # Always remove escape sequences when writing the build log.
-                    output_file.write(output_noescape)
-                    # If idf.py output is redirected and the output stream is not a TTY,
-                    # strip the escape sequences as well.
-                    # (There shouldn't be any, but just in case.)
-                    if not output_stream.isatty():
-                        output = output_noescape
-
-                    if is_progression_processing_enabled and is_progression(output):
-                        print_progression(output)
-                        is_progression_last_line = True
-                    else:
-                        if is_progression_last_line:
-                            output_converter.write(os.linesep)
-                            is_progression_last_line = False
-                        output_converter.write(output)
-                        output_converter.flush()
-
-                        # process hints for last line and print them right away
-                        if self.interactive:
-                            last_line += output
-                            if last_line[-1] == '\n':
-                                for hint in generate_hints_buffer(last_line, hints):
-                                    yellow_print(hint)
-                                last_line = ''
-        except (RuntimeError, EnvironmentError) as e:
-            yellow_print('WARNING: The exception {} was raised and we can\'t capture all your {} and '
-                         'hints on how to resolve errors can be not accurate.'.format(e, output_stream.name.strip('<>')))
+        def write_output(output: str) -> None:
+            nonlocal last_line, is_progression_last_line
+            if not output:
+                return
+
+            output_noescape = delete_ansi_escape(output)
+            # Always remove escape sequences when writing the build log.
+            output_file.write(output_noescape)
+            # If idf.py output is redirected and the output stream is not a TTY,
+            # strip the escape sequences as well.
+            # (There shouldn't be any, but just in case.)
+            if not output_stream.isatty():
+                output = output_noescape
+
+            if is_progression_processing_enabled and is_progression(output):
+                print_progression(output)
+                is_progression_last_line = True
+            else:
+                if is_progression_last_line:
+                    output_converter.write(os.linesep)
+                    is_progression_last_line = False
+                output_converter.write(output)
+                output_converter.flush()
+
+                # process hints for finished lines and print them right away
+                if self.interactive:
+                    last_line += output
+                    if '\n' in output:
+                        lines = last_line.split('\n')
+                        last_line = lines.pop()
+                        for line in lines:
+                            for hint in generate_hints_buffer(line + '\n', hints):
+                                yellow_print(hint)
+
+        return write_output
+
+    @staticmethod
+    def print_capture_warning(exception: Exception, output_stream: TextIO) -> None:
+        yellow_print('WARNING: The exception {} was raised and we can\'t capture all your {} and '
+                     'hints on how to resolve errors can be not accurate.'.format(exception, output_stream.name.strip('<>')))
 
 
 def run_tool(*args: Any, **kwargs: Any) -> None:
@@ -471,12 +753,13 @@ def run_target(target_name: str, args: 'PropertyDict', env: Optional[Dict]=None,
             force_progression=force_progression, interactive=interactive)()
 
 
-def _strip_quotes(value: str, regexp: re.Pattern=re.compile(r"^\"(.*)\"$|^'(.*)'$|^(.*)$")) -> Optional[str]:
+def _strip_quotes(value: str) -> str:
     """
     Strip quotes like CMake does during parsing cache entries
     """
-    matching_values = regexp.match(value)
-    return [x for x in matching_values.groups() if x is not None][0].rstrip() if matching_values is not None else None
+    if len(value) >= 2 and value[0] == value[-1] and value[0] in ('"', "'"):
+        value = value[1:-1]
+    return value.rstrip()
 
 
 def _parse_cmakecache(path: str) -> Dict:
@@ -486,16 +769,19 @@ def _parse_cmakecache(path: str) -> Dict:
     Returns a dict of name:value.
 
     CMakeCache entries also each have a "type", but this is currently ignored.
+
+    The parsed entries are reused until the file changes.
     """
-    result = {}
-    with open(path, encoding='utf-8') as f:
-        for line in f:
-            # cmake cache lines look like: CMAKE_CXX_FLAGS_DEBUG:STRING=-g
-            # groups are name, type, value
-            m = re.match(r'^([^#/:=]+):([^:=]+)=(.*)\n$', line)
-            if m:
-                result[m.group(1)] = m.group(3)
-    return result
+    stat = os.stat(path)
+    cached = _CMAKECACHE_CACHE.get(path)
+    if cached and cached[:2] == (stat.st_mtime_ns, stat.st_size):
+        return dict(cached[2])
+
+    with open(path, 'rb') as f:
+        result = {name.decode('utf-8'): value.decode('utf-8') for name, _, value in _CMAKECACHE_LINE_RE.findall(f.read())}
+
+    _CMAKECACHE_CACHE[path] = (stat.st_mtime_ns, stat.st_size, result)
+    return dict(result)
 
 
 def _parse_cmdl_cmakecache(entries: List) -> Dict[str, str]:
@@ -514,12 +800,7 @@ def _parse_cmdl_cmakecache(entries: List) -> Dict[str, str]:
 
 
 def _new_cmakecache_entries(cache: Dict, cache_cmdl: Dict) -> bool:
-    for entry in cache_cmdl:
-        if entry not in cache:
-            return True
-        if cache_cmdl[entry] != cache[entry]:
-            return True
-    return False
+    return any(entry not in cache or cache[entry] != value for entry, value in cache_cmdl.items())
 
 
 def _detect_cmake_generator(prog_name: str) -> Any:
@@ -616,11 +897,12 @@ def ensure_build_directory(args: 'PropertyDict', prog_name: str, always_run_cmak
                          (generator, args.generator, prog_name))
 
     try:
-        home_dir = cache['CMAKE_HOME_DIRECTORY']
-        if os.path.realpath(home_dir) != os.path.realpath(project_dir):
+        home_dir = os.path.realpath(cache['CMAKE_HOME_DIRECTORY'])
+        real_project_dir = os.path.realpath(project_dir)
+        if home_dir != real_project_dir:
             raise FatalError(
                 "Build directory '%s' configured for project '%s' not '%s'. Run '%s fullclean' to start again." %
-                (build_dir, os.path.realpath(home_dir), os.path.realpath(project_dir), prog_name))
+                (build_dir, home_dir, real_project_dir, prog_name))
     except KeyError:
         pass  # if cmake failed part way, CMAKE_HOME_DIRECTORY may not be set yet
 
@@ -677,18 +959,30 @@ def get_sdkconfig_value(sdkconfig_file: str, key: str) -> Optional[str]:
     If sdkconfig_file does not exist or the option is not present, returns None.
     """
     assert key.startswith('CONFIG_')
-    if not os.path.exists(sdkconfig_file):
+    try:
+        stat = os.stat(sdkconfig_file)
+    except OSError:
+        return None
+    return _get_sdkconfig_value(sdkconfig_file, stat.st_mtime_ns, stat.st_size, key)
+
+
+@functools.lru_cache(maxsize=256)
+def _get_sdkconfig_value(sdkconfig_file: str, mtime: int, size: int, key: str) -> Optional[str]:
+    """
+    Search sdkconfig_file for the value of given key. The modification time and size of the file
+    are part of the arguments only to make sure that results cached for an older file are not used.
+    """
+    if not size:
+        # empty file can't be mapped
         return None
-    # keep track of the last seen value for the given key
-    value = None
     # if the value is quoted, this excludes the quotes from the value
-    pattern = re.compile(r"^{}=\"?([^\"]*)\"?$".format(key))
-    with open(sdkconfig_file, 'r') as f:
-        for line in f:
-            match = re.match(pattern, line)
-            if match:
-                value = match.group(1)
-    return value
+    pattern = re.compile(rb'^' + re.escape(key.encode()) + rb'="?([^"\r\n]*)"?\r?$', re.MULTILINE)
+    with open(sdkconfig_file, 'rb') as f:
+        # the whole file is searched by the regex engine at once
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            values = pattern.findall(data)
+    # return the last seen value for the given key
+    return values[-1].decode() if values else None
 
 
 def is_target_supported(project_path: str, supported_targets: List) -> bool:
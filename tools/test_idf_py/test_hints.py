@@ -3,12 +3,13 @@
 # SPDX-FileCopyrightText: 2022-2023 Espressif Systems (Shanghai) CO LTD
 # SPDX-License-Identifier: Apache-2.0
 import os
+import re
 import sys
 import tempfile
 import unittest
 from pathlib import Path
 from subprocess import run
-from typing import List
+from typing import List, Optional
 
 import yaml
 
@@ -23,10 +24,10 @@ CWD = os.path.join(os.path.dirname(__file__))
 ERR_OUT_YML = os.path.join(CWD, 'error_output.yml')
 
 try:
-    from idf_py_actions.tools import generate_hints
+    from idf_py_actions.tools import _literal_anchor, generate_hints
 except ImportError:
     sys.path.append(os.path.join(CWD, '..'))
-    from idf_py_actions.tools import generate_hints
+    from idf_py_actions.tools import _literal_anchor, generate_hints
 
 
 class TestHintsMassages(unittest.TestCase):
@@ -41,13 +42,45 @@ class TestHintsMassages(unittest.TestCase):
         for error, hint in error_output.items():
             with open(error_filename, 'w') as f:
                 f.write(error)
-            for generated_hint in generate_hints(f.name):
-                self.assertEqual(generated_hint, hint)
+            self.assertEqual(list(generate_hints(f.name)), [hint])
 
     def tearDown(self) -> None:
         self.tmpdir.cleanup()
 
 
+class TestLiteralAnchor(unittest.TestCase):
+    def anchor(self, pattern: str) -> Optional[str]:
+        return _literal_anchor(re.compile(pattern))
+
+    def test_literal(self) -> None:
+        self.assertEqual(self.anchor('No such file or directory'), 'No such file or directory')
+        self.assertEqual(self.anchor('abc'), None)
+
+    def test_alternation(self) -> None:
+        self.assertEqual(self.anchor('undefined reference|multiple definition'), None)
+        self.assertEqual(self.anchor('fatal error: (spiram.h|esp_spiram.h): No such file'), ' No such file')
+
+    def test_repeat(self) -> None:
+        self.assertEqual(self.anchor('colou?r names'), 'r names')
+        self.assertEqual(self.anchor('abcdef{2}gh'), 'abcde')
+        self.assertEqual(self.anchor('ab+cdefg'), 'cdefg')
+        # not a repeat, the braces are matched literally
+        self.assertEqual(self.anchor('a{x}cdef'), 'cdef')
+
+    def test_set(self) -> None:
+        self.assertEqual(self.anchor('[]abcdefgh]wxyz'), 'wxyz')
+        self.assertEqual(self.anchor('[^]abcdefgh]wxyz'), 'wxyz')
+        self.assertEqual(self.anchor(r'[\]abcdefgh]wxyz'), 'wxyz')
+
+    def test_escape(self) -> None:
+        self.assertEqual(self.anchor(r'\d+ abcde\x1bfgh'), ' abcde')
+        self.assertEqual(self.anchor(r'\N{DEGREE SIGN}abcdef'), 'abcdef')
+
+    def test_flags(self) -> None:
+        self.assertEqual(self.anchor('(?i)No such file or directory'), None)
+        self.assertEqual(self.anchor('(?x)No such file or directory'), None)
+
+
 def run_idf(args: List[str], cwd: Path) -> str:
     # Simple helper to run idf command and return it's stdout.
     cmd = [
@@ -7,6 +7,7 @@ import json
 import os
 import subprocess
 import sys
+import tempfile
 from unittest import TestCase, main, mock
 
 import elftools.common.utils as ecu
@@ -20,9 +21,11 @@ except ImportError:
 
 try:
     import idf
+    from idf_py_actions.tools import _parse_cmakecache, get_sdkconfig_value
 except ImportError:
     sys.path.append('..')
     import idf
+    from idf_py_actions.tools import _parse_cmakecache, get_sdkconfig_value
 
 current_dir = os.path.dirname(os.path.realpath(__file__))
 idf_py_path = os.path.join(current_dir, '..', 'idf.py')
@@ -344,5 +347,65 @@ class TestFileArgumentExpansion(TestCase):
         self.assertIn('(expansion of @args_non_existent) could not be opened', cm.exception.output.decode('utf-8', 'ignore'))
 
 
+class TestConfigFiles(TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+
+    def write_file(self, name, content):
+        path = os.path.join(self.tmpdir.name, name)
+        with open(path, 'wb') as f:
+            f.write(content)
+        return path
+
+    def test_sdkconfig_value(self):
+        """Test values of options read from sdkconfig"""
+        sdkconfig = self.write_file('sdkconfig', (b'# CONFIG_DISABLED is not set\n'
+                                                  b'CONFIG_STRING="some value"\n'
+                                                  b'CONFIG_BOOL=y\n'
+                                                  b'CONFIG_EMPTY=""\n'
+                                                  b'CONFIG_LAST=1\n'
+                                                  b'CONFIG_LAST=2'))
+        self.assertEqual(get_sdkconfig_value(sdkconfig, 'CONFIG_STRING'), 'some value')
+        self.assertEqual(get_sdkconfig_value(sdkconfig, 'CONFIG_BOOL'), 'y')
+        self.assertEqual(get_sdkconfig_value(sdkconfig, 'CONFIG_EMPTY'), '')
+        self.assertEqual(get_sdkconfig_value(sdkconfig, 'CONFIG_LAST'), '2')
+        self.assertIsNone(get_sdkconfig_value(sdkconfig, 'CONFIG_DISABLED'))
+        self.assertIsNone(get_sdkconfig_value(sdkconfig, 'CONFIG_BOO'))
+
+    def test_sdkconfig_value_crlf(self):
+        """Test values of options read from sdkconfig with Windows line endings"""
+        sdkconfig = self.write_file('sdkconfig', b'CONFIG_STRING="some value"\r\nCONFIG_BOOL=y\r\n')
+        self.assertEqual(get_sdkconfig_value(sdkconfig, 'CONFIG_STRING'), 'some value')
+        self.assertEqual(get_sdkconfig_value(sdkconfig, 'CONFIG_BOOL'), 'y')
+
+    def test_sdkconfig_value_missing_file(self):
+        """Test values of options read from missing or empty sdkconfig"""
+        self.assertIsNone(get_sdkconfig_value(os.path.join(self.tmpdir.name, 'sdkconfig'), 'CONFIG_BOOL'))
+        sdkconfig = self.write_file('sdkconfig', b'')
+        self.assertIsNone(get_sdkconfig_value(sdkconfig, 'CONFIG_BOOL'))
+
+    def test_parse_cmakecache(self):
+        """Test entries read from CMakeCache.txt"""
+        cmakecache = self.write_file('CMakeCache.txt', (b'# This is the CMakeCache file.\n'
+                                                        b'//Path to a program.\n'
+                                                        b'CMAKE_AR:FILEPATH=/usr/bin/ar\n'
+                                                        b'#COMMENTED:STRING=1\n'
+                                                        b'IDF_TARGET:STRING=esp32\r\n'
+                                                        b'EMPTY:STRING=\n'
+                                                        b'WITH_EQUALS:STRING=-DA=1 -DB=2\n'
+                                                        b'NO_TYPE=1\n'
+                                                        b'REPEATED:BOOL=OFF\n'
+                                                        b'REPEATED:BOOL=ON\n'
+                                                        b'UNFINISHED:STRING=1'))
+        self.assertEqual(_parse_cmakecache(cmakecache), {'CMAKE_AR': '/usr/bin/ar',
+                                                         'IDF_TARGET': 'esp32',
+                                                         'EMPTY': '',
+                                                         'WITH_EQUALS': '-DA=1 -DB=2',
+                                                         'REPEATED': 'ON'})
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+
 if __name__ == '__main__':
     main()